@@ -7,15 +7,21 @@ __version__ = "0.1.0"
 
 import sys
 from pathlib import Path
-import yaml
 
 from ._constant import PLATFORM_LIST
 
-from .runner import Runner
 from .log   import log
 from .dependency import check_dependencies
 from orbs.config import config
 
+def __getattr__(name):
+    # Runner pulls in behave, the listener hooks and the report generator;
+    # import it on first use so `orbs --help`/`orbs init` don't pay for it
+    if name == "Runner":
+        from .runner import Runner
+        return Runner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def run(target=None, platform=None, device_id=None):    
     # Use platform from CLI if provided, otherwise use default_platform from config
     if platform:
@@ -45,6 +51,8 @@ def run(target=None, platform=None, device_id=None):
         log.error(f"File not found: {p}")
         sys.exit(1)
 
+    from .runner import Runner
+    from .utils import load_yaml
     runner = Runner()
 
     # dispatch by extension + content
@@ -52,7 +60,7 @@ def run(target=None, platform=None, device_id=None):
     if suffix in (".yml", ".yaml"):
         # load minimal YAML to check for 'testsuites'
         try:
-            spec = yaml.safe_load(p.read_text())
+            spec = load_yaml(p.read_text())
         except Exception as e:
             log.error(f"Failed to parse YAML {p}: {e}")
             sys.exit(1)
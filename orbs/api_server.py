@@ -2,7 +2,6 @@
 
 from flask import Flask, jsonify, request
 import os
-import yaml
 import subprocess
 import sys
 import re
@@ -11,6 +10,7 @@ from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
 from pathlib import Path
 from dotenv import load_dotenv
+from orbs.utils import load_yaml
 
 load_dotenv()
 
@@ -64,7 +64,7 @@ def find_all_yaml_files():
             rel = full_path.relative_to(base_dir)
             logical_path = f"{key}/{rel.as_posix()}"
             try:
-                yml_data = yaml.safe_load(full_path.read_text())
+                yml_data = load_yaml(full_path.read_text())
                 yaml_files.append({
                     "name":       rel.as_posix(),
                     "path":       logical_path,
@@ -1,5 +1,13 @@
 # File: orbs/browser_factory.py
+import atexit
+import copy
+import logging
 import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from orbs.exception import BrowserDriverException
 from orbs.guard import orbs_guard
 from selenium import webdriver
@@ -11,160 +19,411 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
 from orbs.config import config
-from orbs.thread_context import get_context, set_context
+from orbs.thread_context import get_context, setdefault_context
 from orbs.log import log
+
+# Idle drivers waiting to be reused, keyed by the configuration they were launched with.
+# Each queue holds (driver, real_quit) pairs.
+_DRIVER_POOL = {}
+_DRIVER_POOL_LOCK = threading.Lock()
+
+# Next free suffix per (rpt_dir, base, ext), so repeated names don't re-probe the disk.
+# Races only cost a retry: names are claimed with O_EXCL, not by this counter.
+_SCREENSHOT_COUNTERS = {}
+_RESERVE_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+
+# Background launcher used when lazy_driver=true
+_DRIVER_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="orbs-driver")
+
+
+def _acquire_pooled_driver(key):
+    """Pop a live idle driver for this configuration, or None on a pool miss"""
+    with _DRIVER_POOL_LOCK:
+        idle = _DRIVER_POOL.get(key)
+    if idle is None:
+        return None
+
+    while True:
+        try:
+            driver, real_quit = idle.get_nowait()
+        except queue.Empty:
+            return None
+        try:
+            driver.current_url  # Session check, the browser may have died while idle
+        except Exception:
+            try:
+                real_quit()
+            except Exception:
+                pass
+            continue
+        driver._orbs_idle = False
+        log.debug("Reusing pooled driver:", key[0])
+        return driver
+
+
+def _make_poolable(driver, key):
+    """Redirect driver.quit() so the browser goes back to the pool instead of exiting"""
+    max_pool_size = config.get_int("driver_pool_size", 0)
+    if max_pool_size <= 0:
+        return
+    # Only Chromium can wipe the cookies of every domain; elsewhere a reused
+    # browser would leak other sites' cookies into the next test case
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return
+
+    real_quit = driver.quit
+
+    def quit_to_pool(*a, **kw):
+        if getattr(driver, "_orbs_idle", False):
+            return  # Already back in the pool
+        try:
+            # Tabs opened by the test can't be cleaned reliably, retire the browser instead
+            if len(driver.window_handles) > 1:
+                return real_quit(*a, **kw)
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+        except Exception:
+            return real_quit(*a, **kw)
+
+        with _DRIVER_POOL_LOCK:
+            idle = _DRIVER_POOL.get(key)
+            if idle is None:
+                idle = _DRIVER_POOL[key] = queue.Queue(maxsize=max_pool_size)
+        try:
+            driver._orbs_idle = True
+            idle.put_nowait((driver, real_quit))
+        except queue.Full:
+            driver._orbs_idle = False
+            return real_quit(*a, **kw)
+
+    driver.quit = quit_to_pool
+
+
+@atexit.register
+def _shutdown_driver_pool():
+    """Really quit every idle driver when the process exits"""
+    with _DRIVER_POOL_LOCK:
+        pools = list(_DRIVER_POOL.values())
+        _DRIVER_POOL.clear()
+    for idle in pools:
+        while True:
+            try:
+                _, real_quit = idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                real_quit()
+            except Exception:
+                pass
+
+
+def _record_screenshot(abs_path):
+    """Append a screenshot path to this thread's context list"""
+    # Look the list up per save: report_listener swaps in a fresh one after each test case
+    setdefault_context("screenshots", []).append(abs_path)
+
+
+def _screenshot_dir():
+    """Screenshot directory of this thread's report (cwd/screenshots without a report)"""
+    rpt = get_context("report")
+    return getattr(rpt, "screenshots_dir", None) or os.path.join(os.getcwd(), "screenshots")
+
+
+def _add_arguments(options, args):
+    """Append arguments in one go; args come from config.get_list so none are empty"""
+    if hasattr(options, "_arguments"):
+        options._arguments.extend(args)
+    else:
+        # Fallback for Selenium versions with a different internal layout
+        for arg in args:
+            options.add_argument(arg)
+
+
+# Chrome-style flags that Firefox only understands as preferences
+_FIREFOX_ARG_PREFS = {
+    "--incognito": ("browser.privatebrowsing.autostart", True),  # Firefox calls it "private browsing"
+}
+
+
+def _partition_firefox_args(args):
+    """Split configured args into Firefox command-line arguments and preferences"""
+    arguments = []
+    preferences = []
+    args = iter(args)
+    for arg in args:
+        pref = _FIREFOX_ARG_PREFS.get(arg)
+        if pref is not None:
+            preferences.append(pref)
+        elif arg in ("-profile", "--profile"):
+            # Keep the profile flag together with its path argument
+            arguments.append(arg)
+            path = next(args, None)
+            if path is not None:
+                arguments.append(path)
+        elif arg.startswith("--"):
+            arguments.append(arg)
+    return tuple(arguments), tuple(preferences)
+
+
+@lru_cache(maxsize=8)
+def _build_options(browser, headless, window_size, args, shared_profile=False):
+    """Build the Options template for a browser configuration (cached, copy before use)"""
+    if browser == "chrome":
+        options = ChromeOptions()
+
+        # Add headless mode
+        if headless:
+            options.add_argument("--headless=new")
+
+        # Add window size
+        if window_size:
+            options.add_argument(f"--window-size={window_size.replace('x', ',')}")
+
+        # Add browser arguments (all chrome args are supported)
+        _add_arguments(options, args)
+
+    elif browser == "firefox":
+        options = FirefoxOptions()
+
+        # Add headless mode
+        if headless:
+            options.add_argument("--headless")
+
+        # Add window size
+        if window_size:
+            width, height = window_size.split('x')
+            options.add_argument(f"--width={width}")
+            options.add_argument(f"--height={height}")
+
+        # Add browser arguments with Firefox compatibility handling
+        arguments, preferences = _partition_firefox_args(args)
+        _add_arguments(options, arguments)
+        for name, value in preferences:
+            options.set_preference(name, value)
+
+    elif browser == "edge":
+        options = EdgeOptions()
+
+        # Add headless mode
+        if headless:
+            options.add_argument("--headless=new")
+
+        # Add window size
+        if window_size:
+            options.add_argument(f"--window-size={window_size.replace('x', ',')}")
+
+        # Add browser arguments (Edge supports Chrome args)
+        _add_arguments(options, args)
+
+    elif browser == "safari":
+        # Safari doesn't support headless mode natively
+        # Window size is set after driver creation
+        options = SafariOptions()
+
+    else:
+        raise Exception(f"Unsupported browser: {browser}")
+
+    if shared_profile:
+        _use_shared_profile(options, browser, args)
+
+    return options
+
+
+def _use_shared_profile(options, browser, args):
+    """Point the browser at a persistent profile dir unless args already choose one"""
+    profile_dir = os.path.join(tempfile.gettempdir(), f"orbs-{browser}-profile")
+    if browser in ("chrome", "edge"):
+        if any(arg.startswith("--user-data-dir") for arg in args):
+            return
+        os.makedirs(profile_dir, exist_ok=True)
+        # The HTTP cache lives inside the user data dir, so it survives with it
+        options.add_argument(f"--user-data-dir={profile_dir}")
+    elif browser == "firefox":
+        if any(arg in ("-profile", "--profile") for arg in args):
+            return
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument("-profile")
+        options.add_argument(profile_dir)
+
+
+def _build_chrome(options, driver_path):
+    # Create driver with optional custom driver path
+    if driver_path:
+        return webdriver.Chrome(service=ChromeService(executable_path=driver_path), options=options)
+    return webdriver.Chrome(options=options)
+
+
+def _build_firefox(options, driver_path):
+    if driver_path:
+        return webdriver.Firefox(service=FirefoxService(executable_path=driver_path), options=options)
+    return webdriver.Firefox(options=options)
+
+
+def _build_edge(options, driver_path):
+    if driver_path:
+        return webdriver.Edge(service=EdgeService(executable_path=driver_path), options=options)
+    return webdriver.Edge(options=options)
+
+
+def _build_safari(options, driver_path):
+    # safaridriver ships with macOS, a custom driver path is not supported
+    return webdriver.Safari(options=options)
+
+
+# Driver constructor per supported browser name
+_BROWSER_BUILDERS = {
+    "chrome": _build_chrome,
+    "firefox": _build_firefox,
+    "edge": _build_edge,
+    "safari": _build_safari,
+}
+
+
+class _LazyDriver:
+    """Stands in for a WebDriver that is still launching; blocks on first use"""
+
+    def __init__(self, future):
+        object.__setattr__(self, "_future", future)
+
+    def __getattr__(self, name):
+        return getattr(self._future.result(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._future.result(), name, value)
+
+
 class BrowserFactory:
     @staticmethod
     @orbs_guard(BrowserDriverException)
     def create_driver():
-        
-        # Check if platform is set in context (from CLI --platform or collection)
-        platform_from_context = get_context('platform')
-        if platform_from_context:
-            # Use platform from CLI/context as browser
-            browser = platform_from_context.lower()
-        else:
-            # Fallback to browser config from settings/browser.properties
-            browser = config.get("browser", "chrome").lower()
-        
+
+        # Platform from CLI --platform or collection wins over settings/browser.properties.
+        # Not cached: the runner switches platform per collection entry, and config reads env.
+        browser = (get_context('platform') or config.get("browser", "chrome")).lower()
+
         # Load browser configuration from settings/browser.properties
         headless = config.get_bool("headless", False)
         window_size = config.get("window_size", None)
         driver_path = config.get("driver_path", None)
-        
+
         # Get browser arguments from settings (comma-separated)
         # Framework handles browser-specific compatibility automatically
         args_list = config.get_list("args", sep=",")
-        
-        log.debug(f"Creating {browser} driver (headless={headless}, window_size={window_size}, args={args_list})")
-
-        if browser == "chrome":
-            options = ChromeOptions()
-            
-            # Add headless mode
-            if headless:
-                options.add_argument("--headless=new")
-            
-            # Add window size
-            if window_size:
-                options.add_argument(f"--window-size={window_size.replace('x', ',')}")
-            
-            # Add browser arguments (all chrome args are supported)
-            for arg in args_list:
-                options.add_argument(arg)
-            
-            # Create driver with optional custom driver path
-            if driver_path:
-                service = ChromeService(executable_path=driver_path)
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                driver = webdriver.Chrome(options=options)
-
-        elif browser == "firefox":
-            options = FirefoxOptions()
-            
-            # Add headless mode
-            if headless:
-                options.add_argument("--headless")
-            
-            # Add window size
-            if window_size:
-                width, height = window_size.split('x')
-                options.add_argument(f"--width={width}")
-                options.add_argument(f"--height={height}")
-            
-            # Add browser arguments with Firefox compatibility handling
-            for arg in args_list:
-                if arg == "--incognito":
-                    # Firefox calls it "private browsing"
-                    options.set_preference("browser.privatebrowsing.autostart", True)
-                elif arg.startswith("--"):
-                    options.add_argument(arg)
-            
-            # Create driver with optional custom driver path
-            if driver_path:
-                service = FirefoxService(executable_path=driver_path)
-                driver = webdriver.Firefox(service=service, options=options)
-            else:
-                driver = webdriver.Firefox(options=options)
-
-        elif browser == "edge":
-            options = EdgeOptions()
-            
-            # Add headless mode
-            if headless:
-                options.add_argument("--headless=new")
-            
-            # Add window size
-            if window_size:
-                options.add_argument(f"--window-size={window_size.replace('x', ',')}")
-            
-            # Add browser arguments (Edge supports Chrome args)
-            for arg in args_list:
-                options.add_argument(arg)
-            
-            # Create driver with optional custom driver path
-            if driver_path:
-                service = EdgeService(executable_path=driver_path)
-                driver = webdriver.Edge(service=service, options=options)
-            else:
-                driver = webdriver.Edge(options=options)
-
-        elif browser == "safari":
-            options = SafariOptions()
-            
-            # Safari doesn't support headless mode natively
-            # Window size is set after driver creation
-            
-            driver = webdriver.Safari(options=options)
-            
-            # Set window size if specified
-            if window_size and not headless:
-                width, height = window_size.split('x')
-                driver.set_window_size(int(width), int(height))
 
-        else:
-            raise Exception(f"Unsupported browser: {browser}")
-        
-        # Set window size for browsers that support it (if not already set)
-        if window_size and browser not in ["safari"]:
+        # Optional Selenium Grid / standalone driver server instead of a local driver
+        remote_url = config.get("remote_url", None)
+
+        # Optionally keep one browser profile (HTTP cache, compiled JS) across launches
+        shared_profile = config.get_bool("shared_profile", False)
+
+        pool_key = (browser, headless, window_size, driver_path, tuple(args_list), remote_url, shared_profile)
+
+        # Ensure screenshots list exists for this thread
+        setdefault_context("screenshots", [])
+
+        # Resolved here, in the caller's thread: the report lives in thread context
+        rpt_dir = _screenshot_dir()
+
+        if config.get_bool("lazy_driver", False):
+            # Launch in the background; the caller only waits once it touches the driver
+            return _LazyDriver(_DRIVER_EXECUTOR.submit(BrowserFactory._launch_driver, pool_key, rpt_dir))
+        return BrowserFactory._launch_driver(pool_key, rpt_dir)
+
+    @staticmethod
+    @orbs_guard(BrowserDriverException)
+    def _launch_driver(pool_key, rpt_dir):
+        """Get a ready-to-use driver for the configuration described by pool_key"""
+        browser, headless, window_size, driver_path, args_list, remote_url, shared_profile = pool_key
+
+        # Reuse an idle browser launched with the same configuration when possible
+        driver = _acquire_pooled_driver(pool_key)
+        if driver is None:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Creating {browser} driver (headless={headless}, window_size={window_size}, args={list(args_list)})")
+            driver = BrowserFactory._build_driver(
+                browser, headless, window_size, driver_path, args_list, remote_url, shared_profile
+            )
+            _make_poolable(driver, pool_key)
+
+        # Set window size (Safari has no headless mode, so skip it there when headless)
+        if window_size and not (browser == "safari" and headless):
             try:
                 width, height = window_size.split('x')
                 driver.set_window_size(int(width), int(height))
             except:
                 pass  # Ignore if already set via arguments
 
-        # Ensure screenshots list exists for this thread
-        if get_context("screenshots") is None:
-            set_context("screenshots", [])
-
-        original_save = driver.save_screenshot
+        # Bind the class method: a pooled driver still carries the wrapper from its previous use
+        original_save = type(driver).save_screenshot.__get__(driver)
+        # Closure-local aliases, save_to_report runs for every screenshot
+        isabs, splitext, join, abspath = os.path.isabs, os.path.splitext, os.path.join, os.path.abspath
+        open_fd, close_fd = os.open, os.close
+        rpt_dir_ready = False
 
         def save_to_report(path, *a, **kw):
-            # Determine full path to save into
-            if not os.path.isabs(path):
-                try:
-                    rpt = get_context("report")
-                    rpt_dir = rpt.screenshots_dir
-                except Exception:
-                    rpt_dir = os.path.join(os.getcwd(), "screenshots")
-                os.makedirs(rpt_dir, exist_ok=True)
+            nonlocal rpt_dir_ready
+            # Absolute path: the caller picked the file, nothing to resolve or reserve
+            if isabs(path):
+                saved = original_save(path, *a, **kw)
+                if saved:
+                    _record_screenshot(path)
+                return saved
 
-                filename = path
-                base, ext = os.path.splitext(filename)
-                path = os.path.join(rpt_dir, filename)
-                i = 1
-                while os.path.exists(path):
-                    path = os.path.join(rpt_dir, f"{base}_{i}{ext}")
-                    i += 1
+            # Relative path: save into the report's screenshots dir under a free name
+            try:
+                if not rpt_dir_ready:
+                    os.makedirs(rpt_dir, exist_ok=True)
+                    rpt_dir_ready = True
 
-            # Append the screenshot path to the context
-            abs_path = os.path.abspath(path)
-            screenshots = get_context("screenshots") or []
-            screenshots.append(abs_path)
-            set_context("screenshots", screenshots)
+                filename = path
+                base, ext = splitext(filename)
+                key = (rpt_dir, base, ext)
+                i = _SCREENSHOT_COUNTERS.get(key, 0)
+                while True:
+                    path = join(rpt_dir, filename if i == 0 else f"{base}_{i}{ext}")
+                    try:
+                        # Reserve the name: O_EXCL fails if any thread or process already has it
+                        close_fd(open_fd(path, _RESERVE_FLAGS, 0o644))
+                        break
+                    except FileExistsError:
+                        i += 1
+            except OSError:
+                # Missing subdirectory, unwritable dir, ...: fail like Selenium's save_screenshot
+                return False
+            _SCREENSHOT_COUNTERS[key] = i + 1
 
-            return original_save(path, *a, **kw)
+            saved = False
+            try:
+                saved = original_save(path, *a, **kw)
+            finally:
+                if not saved:
+                    # Don't leave the empty placeholder behind
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            if saved:
+                _record_screenshot(abspath(path))
+            return saved
 
         driver.save_screenshot = save_to_report
         return driver
+
+    @staticmethod
+    def _build_driver(browser, headless, window_size, driver_path, args_list, remote_url=None, shared_profile=False):
+        """Launch a new browser process for the given configuration"""
+        try:
+            build = _BROWSER_BUILDERS[browser]
+        except KeyError:
+            raise Exception(f"Unsupported browser: {browser}")
+
+        # Copy the cached template so Selenium never mutates the shared instance
+        options = copy.deepcopy(_build_options(browser, headless, window_size, tuple(args_list), shared_profile))
+        if remote_url:
+            # Selenium keeps the connection to the server alive between commands by default
+            return webdriver.Remote(command_executor=remote_url, options=options)
+        return build(options, driver_path)
@@ -1,18 +1,20 @@
+import itertools
+import json
 import os
+import re
+import socket
+import sys
+import tempfile
 import time
+from email.utils import formatdate
 from urllib.parse import urlparse
-from dotenv import load_dotenv
-import requests
 import typer
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from orbs._constant import PLATFORM_LIST
-from orbs.spy.mobile import MobileSpyRunner
-from orbs.spy.web import WebSpyRunner
 from orbs.utils import render_template
-from orbs import run
 import subprocess
-from InquirerPy import inquirer
 from orbs.config import config
 
 
@@ -29,21 +31,45 @@ TEMPLATE_JINJA_DIR = BASE_DIR / "templates" / "jinja"
 SETTINGS_DIR = Path.cwd() / "settings"
 APPIUM_PROPS = SETTINGS_DIR / "appium.properties"
 
+# PATH lookups stat every PATH entry; cache them. Call _which.cache_clear() after installing tools
+_which = lru_cache(maxsize=None)(shutil.which)
 
-def get_connected_devices():
-    """Use adb to list connected device IDs"""
+# Gherkin step parsing for implement_feature
+_STEP_RE = re.compile(r"(Given|When|Then|And|\*)\s+(.*)")
+_ANGLE_RE = re.compile(r"<([^>]+)>")
+_BRACE_RE = re.compile(r"{(.*?)}")
+
+
+# adb device list cache: spawning adb is slow and the list rarely changes within seconds
+_DEVICES_TTL = 5.0
+_devices_cache = {"t": 0.0, "v": None}
+# "<serial>   device product:... model:... transport_id:..." rows of `adb devices -l`
+_ADB_DEVICE_RE = re.compile(r"^(\S+)\s+device\b(.*)$", re.MULTILINE)
+
+
+def get_connected_device_details() -> list[dict]:
+    """Use `adb devices -l` to list connected devices with their model/product info"""
+    if _devices_cache["v"] is not None and time.monotonic() - _devices_cache["t"] < _DEVICES_TTL:
+        return [dict(d) for d in _devices_cache["v"]]
     try:
-        output = subprocess.check_output(["adb", "devices"], universal_newlines=True)
+        output = subprocess.check_output(["adb", "devices", "-l"], universal_newlines=True)
     except Exception:
         return []
     devices = []
-    for line in output.splitlines()[1:]:
-        if not line.strip():
-            continue
-        parts = line.split()
-        if len(parts) >= 2 and parts[1] == 'device':
-            devices.append(parts[0])
-    return devices
+    for serial, tail in _ADB_DEVICE_RE.findall(output):
+        info = {"serial": serial}
+        for field in tail.split():
+            key, sep, value = field.partition(":")
+            if sep:
+                info[key] = value
+        devices.append(info)
+    _devices_cache["t"], _devices_cache["v"] = time.monotonic(), devices
+    return [dict(d) for d in devices]
+
+
+def get_connected_devices():
+    """Use adb to list connected device IDs"""
+    return [d["serial"] for d in get_connected_device_details()]
 
 
 def choose_device(devices: list[str]) -> str:
@@ -51,6 +77,7 @@ def choose_device(devices: list[str]) -> str:
     if not devices:
         typer.secho("❌ No connected devices found", fg=typer.colors.RED)
         raise typer.Exit(1)
+    from InquirerPy import inquirer  # pulls in prompt_toolkit; only load when prompting
     choice = inquirer.select(
         message="Select device:",
         choices=devices,
@@ -59,63 +86,93 @@ def choose_device(devices: list[str]) -> str:
     return choice
 
 
+def _set_property(path: Path, key: str, value: str):
+    """Set one key in a .properties file, leaving every other line untouched"""
+    lines = path.read_text().splitlines() if path.exists() else []
+    found = False
+    for number, line in enumerate(lines):
+        name, sep, _ = line.partition("=")
+        if sep and not line.lstrip().startswith("#") and name.strip() == key:
+            lines[number] = f"{key}={value}"
+            found = True
+    if not found:
+        lines.append(f"{key}={value}")
+    path.write_text("\n".join(lines) + "\n")
+
+
 def write_device_property(device_name: str):
     """Update only the deviceName in appium.properties"""
     SETTINGS_DIR.mkdir(parents=True, exist_ok=True)
-    props = []
-    if APPIUM_PROPS.exists():
-        props = APPIUM_PROPS.read_text().splitlines()
-    updated = False
-    new_lines = []
-    for line in props:
-        if line.strip().startswith('deviceName='):
-            new_lines.append(f'deviceName={device_name}')
-            updated = True
-        else:
-            new_lines.append(line)
-    if not updated:
-        new_lines.append(f'deviceName={device_name}')
-    APPIUM_PROPS.write_text("\n".join(new_lines) + "\n")
+    _set_property(APPIUM_PROPS, "deviceName", device_name)
     typer.secho(f"✅ Updated deviceName={device_name} in {APPIUM_PROPS}", fg=typer.colors.GREEN)
 
+def _appium_ready(session, status_url: str, address: tuple) -> bool:
+    """Check Appium's /status, skipping the HTTP request when nothing listens on the port"""
+    try:
+        socket.create_connection(address, timeout=0.3).close()
+    except OSError:
+        return False
+    try:
+        return session.get(status_url, timeout=2).status_code == 200
+    except Exception:
+        return False
+
+
 def ensure_appium_server():
     """Ensure an Appium server is running, otherwise start one"""
+    import requests
+
     url = config.get("appium_url", "http://localhost:4723/wd/hub")
     status_url = url.rstrip('/') + '/status'
-    try:
-        if requests.get(status_url, timeout=2).status_code == 200:
-            return
-    except Exception:
-        pass
 
     # Parse host and port
     parsed = urlparse(url)
     host = parsed.hostname or '0.0.0.0'
     port = parsed.port or 4723
+    # A wildcard bind address isn't connectable everywhere; probe loopback instead
+    address = ('127.0.0.1' if host == '0.0.0.0' else host, port)
+
+    # One keep-alive connection for the initial probe and all readiness polls
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    if _appium_ready(session, status_url, address):
+        return
+
     typer.secho(f"⚙️  Starting Appium server at {host}:{port}", fg=typer.colors.YELLOW)
-    cmd = f"appium --address {host} --port {port}"
-    try:
-        # Use shell=True for Windows to pick up appium.cmd
-        subprocess.Popen(cmd, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except Exception:
-        # fallback to npx if installed
+    server_args = ["--address", host, "--port", str(port)]
+    # shutil.which honours PATHEXT, so Windows picks up appium.cmd without a shell
+    appium = _which("appium")
+    npx = _which("npx")
+    process = None
+    # Try appium first, then fall back to npx; skip whichever isn't installed
+    for cmd in ([appium, *server_args] if appium else None,
+                [npx, "appium", *server_args] if npx else None):
+        if cmd is None:
+            continue
         try:
-            subprocess.Popen(f"npx appium --address {host} --port {port}", shell=True,
-                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except Exception:
-            typer.secho(
-                "❌ Could not start Appium. Ensure 'appium' or 'npx appium' is in your PATH.",
-                fg=typer.colors.RED
-            )
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            break
+        except OSError:
+            continue
+    if process is None:
+        typer.secho(
+            "❌ Could not start Appium. Ensure 'appium' or 'npx appium' is in your PATH.",
+            fg=typer.colors.RED
+        )
+        raise typer.Exit(1)
+    # Wait for server to be ready: poll often at first, then back off
+    delay = 0.1
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        if _appium_ready(session, status_url, address):
+            typer.secho("✅ Appium server is up", fg=typer.colors.GREEN)
+            return
+        # Don't wait out the deadline for a server that has already died
+        if process.poll() is not None:
+            typer.secho(f"❌ Appium exited early with code {process.returncode}", fg=typer.colors.RED)
             raise typer.Exit(1)
-    # Wait for server to be ready
-    for _ in range(10):
-        try:
-            if requests.get(status_url, timeout=2).status_code == 200:
-                typer.secho("✅ Appium server is up", fg=typer.colors.GREEN)
-                return
-        except Exception:
-            time.sleep(1)
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
     typer.secho("❌ Failed to start Appium server", fg=typer.colors.RED)
     raise typer.Exit(1)
 
@@ -134,16 +191,13 @@ def init(project_name: str):
             typer.secho(f"❌ Folder already exists: {dest}", fg=typer.colors.RED)
             raise typer.Exit(1)
 
-        dest.mkdir(parents=True, exist_ok=True)
-
-    for item in src.rglob("*"):
-        rel_path = item.relative_to(src)
-        dest_path = dest / rel_path
-        if item.is_dir():
-            dest_path.mkdir(parents=True, exist_ok=True)
-        else:
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(item, dest_path)
+    # Contents only: neither files nor directories take the installed template's modes,
+    # and an existing destination (orbs init .) keeps its own permissions
+    for root, _, files in os.walk(src):
+        target = dest / Path(root).relative_to(src)
+        target.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            shutil.copyfile(os.path.join(root, name), target / name)
 
     typer.secho(f"✅ Project initialized at {dest}", fg=typer.colors.GREEN)
 
@@ -279,7 +333,6 @@ def create_step(name: str):
 @app.command()
 def implement_feature(name: str):
     """Generate step definition for given feature"""
-    import re
     feature_path = Path.cwd() / "include" / "features" / f"{name}.feature"
     steps_path = Path.cwd() / "include" / "steps" / f"{name}_steps.py"
 
@@ -287,33 +340,30 @@ def implement_feature(name: str):
         typer.secho(f"❌ Feature not found: {feature_path}", fg=typer.colors.RED)
         raise typer.Exit(1)
 
-    steps = ["from behave import given, when, then\n"]
+    steps_path.parent.mkdir(parents=True, exist_ok=True)
     last_decorator = "when"
 
-    with open(feature_path) as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith(("Given", "When", "Then", "And", "*")):
-                parts = line.split(" ", 1)
-                if len(parts) != 2:
-                    continue  # skip malformed
-                keyword, rest = parts
-                decorator = keyword.lower() if keyword.lower() != "and" else last_decorator
+    # Stream each step straight into the output file
+    with steps_path.open("w", buffering=65536) as steps:
+        steps.write("from behave import given, when, then\n")
+        # Feature files are small: one read beats per-line buffered I/O
+        for line in feature_path.read_text().splitlines():
+            match = _STEP_RE.match(line.strip())
+            if match:
+                keyword, rest = match.groups()
+                # "And" and "*" continue the previous step type
+                decorator = keyword.lower() if keyword not in ("And", "*") else last_decorator
                 last_decorator = decorator
 
                 # Convert <param> to {param}
-                pattern = re.sub(r"<([^>]+)>", r"{\1}", rest)
+                pattern = _ANGLE_RE.sub(r"{\1}", rest)
 
                 # Extract argument names from pattern
-                param_names = re.findall(r"{(.*?)}", pattern)
+                param_names = _BRACE_RE.findall(pattern)
                 args = ", ".join(["context"] + param_names)
 
-                steps.append(f"@{decorator}('{pattern}')")
-                steps.append(f"def step_impl({args}):")
-                steps.append("    pass\n")
+                steps.write(f"\n@{decorator}('{pattern}')\ndef step_impl({args}):\n    pass\n")
 
-    steps_path.parent.mkdir(parents=True, exist_ok=True)
-    steps_path.write_text("\n".join(steps))
     typer.secho(f"✅ Implemented feature steps for: {name}", fg=typer.colors.GREEN)
 
 
@@ -337,6 +387,9 @@ def run_command(
             raise typer.Exit(1)
     
     """Run a suite/case/feature with optional environment file"""
+    from dotenv import load_dotenv
+    from orbs import run
+
     # If a custom env file is provided, override defaults
     if env_file:
         if not env_file.exists():
@@ -353,91 +406,145 @@ def select_device():
     device_name = choose_device(devices)
     write_device_property(device_name)    
 
+def _download(url: str, dest: str):
+    """Stream a URL to dest in 1 MiB chunks, skipping the transfer if dest is still current"""
+    import requests
+
+    headers = {}
+    if os.path.exists(dest):
+        headers["If-Modified-Since"] = formatdate(os.path.getmtime(dest), usegmt=True)
+
+    with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        # Write beside dest and swap in, so an interrupted download is never reused
+        partial = dest + ".part"
+        with open(partial, "wb", buffering=1 << 20) as out:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                out.write(chunk)
+        os.replace(partial, dest)
+
+
+def _run_live(cmd: list[str], label: str):
+    """Run a long installer step behind a spinner; show its output only if it fails"""
+    # Output goes to a temp file: an unread PIPE would stall the child once it fills
+    with tempfile.TemporaryFile() as output:
+        process = subprocess.Popen(cmd, stdout=output, stderr=subprocess.STDOUT)
+        if not sys.stdout.isatty():
+            # CI logs and pipes: one line instead of a wall of spinner frames
+            typer.echo(f"⏳ {label}...")
+            process.wait()
+        else:
+            frames = itertools.cycle("|/-\\")
+            while process.poll() is None:
+                typer.echo(f"\r⏳ {label} {next(frames)}", nl=False)
+                time.sleep(0.1)
+            # ⏳ takes two columns: "⏳ " + label + " " + frame is len(label) + 5 wide
+            typer.echo("\r" + " " * (len(label) + 5) + "\r", nl=False)
+        if process.returncode:
+            output.seek(0)
+            typer.echo(output.read().decode(errors="replace"), err=True)
+            raise subprocess.CalledProcessError(process.returncode, cmd)
+
+
 @setup_app.command("android")
 def setup_android():
     """Install required dependencies for Android mobile testing"""
     def install_nodejs_on_windows():
-        import tempfile
-        import urllib.request
-
         NODE_URL = "https://nodejs.org/dist/v20.11.1/node-v20.11.1-x64.msi"  # LTS version
-        temp_dir = tempfile.gettempdir()
-        installer_path = os.path.join(temp_dir, "nodejs_installer.msi")
+        # Kept between runs so a rerun only revalidates the installer instead of refetching it
+        cache_dir = os.path.join(tempfile.gettempdir(), "orbs-cache")
+        os.makedirs(cache_dir, exist_ok=True)
+        installer_path = os.path.join(cache_dir, NODE_URL.rsplit("/", 1)[-1])
 
         typer.secho("⬇️ Downloading Node.js installer...", fg=typer.colors.YELLOW)
-        urllib.request.urlretrieve(NODE_URL, installer_path)
+        _download(NODE_URL, installer_path)
 
         typer.secho("⚙️ Running Node.js installer (silent)...", fg=typer.colors.YELLOW)
         try:
-            subprocess.run(
-                ["msiexec", "/i", installer_path, "/qn", "/norestart"],
-                check=True,
-            )
+            _run_live(["msiexec", "/i", installer_path, "/qn", "/norestart"], "Installing Node.js")
         except subprocess.CalledProcessError:
             typer.secho("❌ Failed to install Node.js. Please install manually.", fg=typer.colors.RED)
             raise typer.Exit(1)
 
         # Confirm npm is available
-        try:
-            subprocess.run("npm --version", shell=True, check=True, stdout=subprocess.DEVNULL)
+        _which.cache_clear()
+        if _which("npm"):
             typer.secho("✅ Node.js installed successfully", fg=typer.colors.GREEN)
-        except subprocess.CalledProcessError:
+        else:
             typer.secho("❌ Node.js installed but not in PATH. Restart terminal or set PATH manually.", fg=typer.colors.RED)
             raise typer.Exit(1)
 
     def install_nodejs_on_posix():
         # macOS/Linux fallback
-        if shutil.which('brew'):
-            subprocess.run("brew install node", shell=True, check=True)
-        elif shutil.which('apt'):
-            subprocess.run("sudo apt update && sudo apt install -y nodejs npm", shell=True, check=True)
+        if _which('brew'):
+            _run_live([_which('brew'), "install", "node"], "Installing Node.js")
+        elif _which('apt'):
+            subprocess.run(["sudo", "apt", "update"], check=True)
+            subprocess.run(["sudo", "apt", "install", "-y", "nodejs", "npm"], check=True)
         else:
             typer.secho("❌ Could not install Node.js automatically. Install it manually from https://nodejs.org/", fg=typer.colors.RED)
             raise typer.Exit(1)
             
     # Ensure Node.js & npm
-    try:
-        subprocess.run("npm --version", shell=True, check=True, stdout=subprocess.DEVNULL)
+    if _which("npm"):
         typer.secho("✅ npm detected", fg=typer.colors.GREEN)
-    except subprocess.CalledProcessError:
+    else:
         typer.secho("⚙️ npm not found. Installing Node.js...", fg=typer.colors.YELLOW)
         if os.name == 'nt':
             install_nodejs_on_windows()
         else:
             install_nodejs_on_posix()
-    
+        _which.cache_clear()
+    # npm.cmd on Windows: resolve the full path so no shell is needed to find it
+    npm = _which("npm")
+    if not npm:
+        typer.secho("❌ npm not found in PATH. Install Node.js from https://nodejs.org/ and rerun.", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
     # Check & install Appium dependencies only if not installed
-    def is_npm_package_installed(package: str) -> bool:
+    def global_npm_packages() -> set[str]:
+        """Names of top-level global npm packages, read with a single npm run"""
         try:
             result = subprocess.run(
-                f"npm list -g {package}",
-                shell=True,
+                [npm, "ls", "-g", "--depth=0", "--json"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True
             )
-            return package in result.stdout
+            # npm ls exits non-zero on tree warnings but still prints the JSON
+            return set(json.loads(result.stdout or "{}").get("dependencies", {}))
         except Exception:
-            return False
+            return set()
 
     deps = ["appium", "appium-uiautomator2-driver"]
+    installed = global_npm_packages()
+    missing = []
     for pkg in deps:
-        if is_npm_package_installed(pkg):
+        if pkg in installed:
             typer.secho(f"✅ {pkg} already installed", fg=typer.colors.GREEN)
         else:
-            typer.secho(f"⬇️ Installing {pkg}...", fg=typer.colors.YELLOW)
-            try:
-                subprocess.run(f"npm install -g {pkg}", shell=True, check=True)
-                typer.secho(f"✅ {pkg} installed", fg=typer.colors.GREEN)
-            except subprocess.CalledProcessError:
-                typer.secho(f"❌ Failed to install {pkg}. Make sure npm works.", fg=typer.colors.RED)
-                raise typer.Exit(1)
+            missing.append(pkg)
+
+    if missing:
+        # One npm run resolves and fetches everything in a single pass
+        names = " ".join(missing)
+        typer.secho(f"⬇️ Installing {names}...", fg=typer.colors.YELLOW)
+        try:
+            _run_live([npm, "install", "-g", *missing], f"Installing {names}")
+            _which.cache_clear()
+            typer.secho(f"✅ {names} installed", fg=typer.colors.GREEN)
+        except subprocess.CalledProcessError:
+            typer.secho(f"❌ Failed to install {names}. Make sure npm works.", fg=typer.colors.RED)
+            raise typer.Exit(1)
 
     typer.secho("✅ All mobile dependencies are ready", fg=typer.colors.GREEN)
 
 @app.command()
 def select_platform():
     """Select platform (mobile or web) and save it to settings"""
+    from InquirerPy import inquirer
     all_platforms = PLATFORM_LIST["mobile"] + PLATFORM_LIST["web"]
 
     choice = inquirer.select(
@@ -450,23 +557,7 @@ def select_platform():
     platform_props = SETTINGS_DIR / "platform.properties"
 
     # Update or create platform.properties
-    lines = []
-    if platform_props.exists():
-        lines = platform_props.read_text().splitlines()
-
-    updated = False
-    new_lines = []
-    for line in lines:
-        if line.startswith("default_platform="):
-            new_lines.append(f"default_platform={choice}")
-            updated = True
-        else:
-            new_lines.append(line)
-
-    if not updated:
-        new_lines.append(f"default_platform={choice}")
-
-    platform_props.write_text("\n".join(new_lines) + "\n")
+    _set_property(platform_props, "default_platform", choice)
 
     typer.secho(f"✅ Selected platform '{choice}' saved to {platform_props}", fg=typer.colors.GREEN)
 
@@ -483,8 +574,11 @@ def spy(web: bool = False, mobile: bool = False, url: str = typer.Option(None, "
             url = 'https://' + url
             typer.secho(f"ℹ️ Added https:// protocol to URL: {url}", fg=typer.colors.BLUE)
         
+        # Spy runners pull in Selenium/Appium; only load the one requested
+        from orbs.spy.web import WebSpyRunner
         runner = WebSpyRunner(url=url)
     elif mobile:
+        from orbs.spy.mobile import MobileSpyRunner
         runner = MobileSpyRunner()  # not yet implemented
     else:
         typer.echo("Please specify a platform: --web or --mobile")
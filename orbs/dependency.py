@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from orbs.exception import DependencyException
 from orbs.guard import orbs_guard
 from orbs.config import config
@@ -7,15 +9,19 @@ from orbs.thread_context import get_context
 def check_dependencies():
     from orbs.cli import choose_device, ensure_appium_server, get_connected_devices, write_device_property
 
-        # Start Appium server if needed
-    ensure_appium_server()
-
     # Read default deviceName from appium.properties if present
     device_name = get_context("device_id", config.get("deviceName", ""))
-    
-    # If a placeholder or empty, prompt selection
-    if not device_name or device_name.lower() in ('', 'auto', 'detect'):
-        print("No deviceName set in context or config. Please select a device.")
-        devices = get_connected_devices()
-        device_name = choose_device(devices)
-        write_device_property(device_name)
\ No newline at end of file
+    needs_device = not device_name or device_name.lower() in ('', 'auto', 'detect')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Enumerate adb devices while the Appium probe/startup runs
+        devices_future = executor.submit(get_connected_devices) if needs_device else None
+
+        # Start Appium server if needed
+        ensure_appium_server()
+
+        # If a placeholder or empty, prompt selection
+        if devices_future is not None:
+            print("No deviceName set in context or config. Please select a device.")
+            device_name = choose_device(devices_future.result())
+            write_device_property(device_name)
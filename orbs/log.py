@@ -53,23 +53,32 @@ class OrbsLogger(logging.Logger):
             return str(msg)
         return " ".join(str(x) for x in (msg, *args))
 
+    # Each method checks the level first so disabled messages are never joined
+
     def debug(self, msg, *args, **kwargs):
-        super().debug(self._format_message(msg, args), **kwargs)
+        if self.isEnabledFor(logging.DEBUG):
+            super().debug(self._format_message(msg, args), **kwargs)
 
     def info(self, msg, *args, **kwargs):
-        super().info(self._format_message(msg, args), **kwargs)
+        if self.isEnabledFor(logging.INFO):
+            super().info(self._format_message(msg, args), **kwargs)
 
     def warning(self, msg, *args, **kwargs):
-        super().warning(self._format_message(msg, args), **kwargs)
+        if self.isEnabledFor(logging.WARNING):
+            super().warning(self._format_message(msg, args), **kwargs)
 
     def error(self, msg, *args, **kwargs):
-        super().error(self._format_message(msg, args), **kwargs)
+        if self.isEnabledFor(logging.ERROR):
+            super().error(self._format_message(msg, args), **kwargs)
 
     def critical(self, msg, *args, **kwargs):
-        super().critical(self._format_message(msg, args), **kwargs)
+        if self.isEnabledFor(logging.CRITICAL):
+            super().critical(self._format_message(msg, args), **kwargs)
     
     def action(self, msg, *args, **kwargs):
         """Log keyword actions (e.g., clicks, typing, navigation) with green color"""
+        if not self.isEnabledFor(logging.INFO):
+            return
         message = self._format_message(msg, args)
         # Use INFO level but mark it as action for custom formatting
         extra = kwargs.get('extra', {})
@@ -14,9 +14,9 @@ class MobileFactory:
     def _restart_uiautomator2():
         """Restart UiAutomator2 server to fix hanging issues"""
         try:
-            subprocess.run(["adb", "shell", "am", "force-stop", "io.appium.uiautomator2.server"], 
-                         timeout=10, capture_output=True)
-            subprocess.run(["adb", "shell", "am", "force-stop", "io.appium.uiautomator2.server.test"], 
+            # One adb round-trip for both packages
+            subprocess.run(["adb", "shell", "am force-stop io.appium.uiautomator2.server; "
+                                            "am force-stop io.appium.uiautomator2.server.test"],
                          timeout=10, capture_output=True)
             time.sleep(2)  # Wait for processes to fully stop
             print("UiAutomator2 server restarted successfully")
@@ -2,7 +2,6 @@ from concurrent.futures import ThreadPoolExecutor
 import os
 import time
 from dotenv import load_dotenv
-import yaml
 import inspect
 from behave.__main__ import main as behave_main
 from orbs.guard import orbs_guard
@@ -13,7 +12,7 @@ from orbs.listener_manager import enabled_listeners, load_suite_listeners
 from orbs.exception import FeatureException, RunnerException
 import sys
 
-from orbs.utils import load_module_from_path
+from orbs.utils import load_module_from_path, load_yaml
 from ._constant import PLATFORM_LIST
 
 
@@ -62,7 +61,7 @@ class Runner:
 
         # Load the suite YAML
         with open(suite_path) as f:
-            suite = yaml.safe_load(f)
+            suite = load_yaml(f)
 
         for case in suite.get("test_cases", []):
             # Handle both old and new format
@@ -159,7 +158,8 @@ class Runner:
             raise FileNotFoundError(f"Collection file not found: {collection_path}")
 
         project_root = os.getcwd()
-        spec = yaml.safe_load(open(collection_path))
+        with open(collection_path) as f:
+            spec = load_yaml(f)
         method = spec.get("execution_method", "sequential")
         max_inst = spec.get("max_concurrent_instances", 1)
         delay = spec.get("delay_between_instances(s)", 0)
@@ -10,6 +10,9 @@ def set_context(key, value):
 def get_context(key, default=None):
     return getattr(_thread_context, key, default)
 
+def setdefault_context(key, default):
+    return vars(_thread_context).setdefault(key, default)
+
 def has_context(key):
     return hasattr(_thread_context, key)
 
@@ -1,19 +1,38 @@
 # orbs/utils.py
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
+import yaml
 from jinja2 import Environment, FileSystemLoader
 
 from .thread_context import get_context
 import importlib.util
 
+try:
+    # libyaml C parser, many times faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+
+def load_yaml(stream):
+    """yaml.safe_load, using the C loader when available"""
+    return yaml.load(stream, Loader=_YamlLoader)
+
+
 def load_env(env_path: str = ".env") -> None:
     """Load environment variables from .env."""
     load_dotenv(env_path)
 
 
+@lru_cache(maxsize=None)
+def _template_env(base_template_dir: str) -> Environment:
+    """One Jinja environment per template dir, so compiled templates are reused"""
+    return Environment(loader=FileSystemLoader(base_template_dir))
+
+
 def render_template(template_name: str, context: dict, dest: Path, base_template_dir: Path):
-    env = Environment(loader=FileSystemLoader(str(base_template_dir)))
-    tpl = env.get_template(template_name)
+    tpl = _template_env(str(base_template_dir)).get_template(template_name)
     content = tpl.render(**context)
 
     dest.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,284 @@
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+from orbs import browser_factory
+from orbs.browser_factory import BrowserFactory
+from orbs.thread_context import clear_context, get_context, set_context
+
+
+class FakeDriver:
+    """Minimal stand-in for a Selenium WebDriver"""
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current_url = "https://example.com"
+        self.quit_calls = 0
+        self.saved = []
+
+    def quit(self):
+        self.quit_calls += 1
+
+    def execute_script(self, script):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        self.current_url = url
+
+    def set_window_size(self, width, height):
+        pass
+
+    def save_screenshot(self, path):
+        self.saved.append(path)
+        return True
+
+
+class FakeChromiumDriver(FakeDriver):
+    """FakeDriver with the Chrome DevTools hook that makes it poolable"""
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+
+class TestDriverPool(unittest.TestCase):
+    """Test driver reuse in BrowserFactory"""
+
+    def setUp(self):
+        clear_context()
+        set_context("platform", "chrome")
+        browser_factory._shutdown_driver_pool()
+        self.built = []
+
+        def build(*args, **kwargs):
+            driver = FakeChromiumDriver()
+            self.built.append(driver)
+            return driver
+
+        patcher = mock.patch.object(BrowserFactory, "_build_driver", side_effect=build)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Reuse is opt-in
+        env = mock.patch.dict(os.environ, {"driver_pool_size": "4"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        browser_factory._shutdown_driver_pool()
+        clear_context()
+
+    def test_quit_returns_driver_to_pool(self):
+        """A quit driver is handed out again instead of launching a new one"""
+        first = BrowserFactory.create_driver()
+        first.quit()
+        second = BrowserFactory.create_driver()
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(first.quit_calls, 0)
+        self.assertEqual(first.current_url, "about:blank")
+
+    def test_double_quit_does_not_duplicate_pool_entry(self):
+        """Quitting twice must not let two callers share one browser"""
+        driver = BrowserFactory.create_driver()
+        driver.quit()
+        driver.quit()
+
+        self.assertIs(BrowserFactory.create_driver(), driver)
+        self.assertIsNot(BrowserFactory.create_driver(), driver)
+
+    def test_different_browser_is_not_reused(self):
+        """Pool entries are keyed by browser configuration"""
+        chrome = BrowserFactory.create_driver()
+        chrome.quit()
+        set_context("platform", "firefox")
+
+        self.assertIsNot(BrowserFactory.create_driver(), chrome)
+
+    def test_extra_windows_retire_driver(self):
+        """A driver with leftover tabs is really quit"""
+        driver = BrowserFactory.create_driver()
+        driver.window_handles = ["main", "popup"]
+        driver.quit()
+
+        self.assertEqual(driver.quit_calls, 1)
+        self.assertIsNot(BrowserFactory.create_driver(), driver)
+
+    def test_driver_without_cdp_is_not_pooled(self):
+        """Firefox, Safari and remote drivers can't clear every cookie, so they are really quit"""
+        with mock.patch.object(BrowserFactory, "_build_driver", side_effect=lambda *a: FakeDriver()):
+            driver = BrowserFactory.create_driver()
+            driver.quit()
+
+            self.assertEqual(driver.quit_calls, 1)
+            self.assertIsNot(BrowserFactory.create_driver(), driver)
+
+    def test_pool_disabled(self):
+        """driver_pool_size=0 restores one browser per create_driver() call"""
+        with mock.patch.dict(os.environ, {"driver_pool_size": "0"}):
+            driver = BrowserFactory.create_driver()
+            driver.quit()
+
+        self.assertEqual(driver.quit_calls, 1)
+
+    def test_pool_disabled_by_default(self):
+        """Without driver_pool_size every quit closes the browser"""
+        del os.environ["driver_pool_size"]
+        driver = BrowserFactory.create_driver()
+        driver.quit()
+
+        self.assertEqual(driver.quit_calls, 1)
+        self.assertIsNot(BrowserFactory.create_driver(), driver)
+
+    def test_lazy_driver_launches_in_background(self):
+        """lazy_driver=true returns a proxy that resolves to the launched driver"""
+        with mock.patch.dict(os.environ, {"lazy_driver": "true"}):
+            driver = BrowserFactory.create_driver()
+
+        self.assertIsInstance(driver, browser_factory._LazyDriver)
+        self.assertEqual(driver.current_url, "https://example.com")
+        self.assertEqual(len(self.built), 1)
+        driver.quit()
+        self.assertIs(BrowserFactory.create_driver(), self.built[0])
+
+    def test_shutdown_quits_idle_drivers(self):
+        """Idle drivers are really quit at interpreter exit"""
+        driver = BrowserFactory.create_driver()
+        driver.quit()
+        browser_factory._shutdown_driver_pool()
+
+        self.assertEqual(driver.quit_calls, 1)
+
+
+class TestFirefoxOptions(unittest.TestCase):
+    """Test Firefox argument handling in _build_options"""
+
+    def test_configured_profile_is_kept(self):
+        """-profile from args is passed on with its path instead of the shared profile"""
+        options = browser_factory._build_options(
+            "firefox", True, "800x600", ("--incognito", "-profile", "/x", "--bar"), True
+        )
+
+        self.assertEqual(options.arguments, ["--headless", "--width=800", "--height=600", "-profile", "/x", "--bar"])
+        self.assertTrue(options.preferences["browser.privatebrowsing.autostart"])
+
+
+class TestRemoteDriver(unittest.TestCase):
+    """Test the remote_url branch of _build_driver"""
+
+    def test_remote_gets_copied_options(self):
+        """A Grid driver gets its own copy of the cached options"""
+        with mock.patch.object(browser_factory.webdriver, "Remote") as remote:
+            BrowserFactory._build_driver("chrome", True, "800x600", None, ["--bar"], "http://grid:4444/wd/hub")
+
+        remote.assert_called_once()
+        kwargs = remote.call_args.kwargs
+        self.assertEqual(kwargs["command_executor"], "http://grid:4444/wd/hub")
+        self.assertIsInstance(kwargs["options"], ChromeOptions)
+        self.assertIn("--bar", kwargs["options"].arguments)
+        self.assertIsNot(kwargs["options"], browser_factory._build_options("chrome", True, "800x600", ("--bar",), False))
+
+
+class TestScreenshotWrapper(unittest.TestCase):
+    """Test screenshot path handling in BrowserFactory"""
+
+    def setUp(self):
+        clear_context()
+        set_context("platform", "chrome")
+        browser_factory._shutdown_driver_pool()
+        self.test_dir = tempfile.mkdtemp()
+        set_context("report", mock.Mock(screenshots_dir=self.test_dir))
+
+        patcher = mock.patch.object(BrowserFactory, "_build_driver", side_effect=lambda *a: FakeChromiumDriver())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        browser_factory._shutdown_driver_pool()
+        clear_context()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_relative_names_are_numbered(self):
+        """Saving the same name twice yields distinct files in the report dir"""
+        driver = BrowserFactory.create_driver()
+        driver.save_screenshot("shot.png")
+        driver.save_screenshot("shot.png")
+
+        self.assertEqual(get_context("screenshots"), [
+            os.path.join(self.test_dir, "shot.png"),
+            os.path.join(self.test_dir, "shot_1.png"),
+        ])
+
+    def test_counter_skips_existing_files(self):
+        """Names already on disk are skipped without clobbering them"""
+        open(os.path.join(self.test_dir, "shot.png"), "w").close()
+        open(os.path.join(self.test_dir, "shot_1.png"), "w").close()
+        driver = BrowserFactory.create_driver()
+        driver.save_screenshot("shot.png")
+        driver.save_screenshot("shot.png")
+
+        self.assertEqual(get_context("screenshots"), [
+            os.path.join(self.test_dir, "shot_2.png"),
+            os.path.join(self.test_dir, "shot_3.png"),
+        ])
+
+    def test_failed_save_releases_name(self):
+        """A failed save doesn't leave an empty placeholder file behind"""
+        with mock.patch.object(FakeDriver, "save_screenshot", lambda self, path: False):
+            driver = BrowserFactory.create_driver()
+            driver.save_screenshot("shot.png")
+
+        self.assertEqual(os.listdir(self.test_dir), [])
+        self.assertEqual(get_context("screenshots"), [])
+
+    def test_unreservable_name_returns_false(self):
+        """A relative name in a missing subdirectory fails like Selenium instead of raising"""
+        driver = BrowserFactory.create_driver()
+
+        self.assertFalse(driver.save_screenshot(os.path.join("step", "login.png")))
+        self.assertEqual(driver.saved, [])
+        self.assertEqual(get_context("screenshots"), [])
+
+    def test_screenshots_follow_context_reset(self):
+        """Saves land in the list currently in context, even after it is replaced"""
+        driver = BrowserFactory.create_driver()
+        driver.save_screenshot("before.png")
+        set_context("screenshots", [])
+        driver.save_screenshot("after.png")
+
+        self.assertEqual(get_context("screenshots"), [os.path.join(self.test_dir, "after.png")])
+
+    def test_absolute_path_is_used_as_is(self):
+        """Absolute paths are saved and recorded without renaming"""
+        target = os.path.join(self.test_dir, "exact.png")
+        driver = BrowserFactory.create_driver()
+        driver.save_screenshot(target)
+        driver.save_screenshot(target)
+
+        self.assertEqual(driver.saved, [target, target])
+        self.assertEqual(get_context("screenshots"), [target, target])
+
+    def test_pooled_driver_is_not_double_wrapped(self):
+        """Reusing a driver records each screenshot once"""
+        with mock.patch.dict(os.environ, {"driver_pool_size": "4"}):
+            driver = BrowserFactory.create_driver()
+            driver.quit()
+            driver = BrowserFactory.create_driver()
+        driver.save_screenshot("shot.png")
+
+        self.assertEqual(len(get_context("screenshots")), 1)
+        self.assertEqual(len(driver.saved), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
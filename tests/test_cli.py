@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+import shutil
+from pathlib import Path
+
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orbs.cli import TEMPLATE_PROJECT_DIR, _set_property, init
+
+
+class TestSetProperty(unittest.TestCase):
+    """Test in-place updates of .properties files"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = Path(self.test_dir) / "appium.properties"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_only_changed_key_is_rewritten(self):
+        """Comments, spacing and duplicate keys of other entries survive untouched"""
+        self.path.write_text(
+            "# Appium settings\n"
+            "\n"
+            "platformName = Android\n"
+            "deviceName=old\n"
+            "extra=1\n"
+            "extra=2\n"
+        )
+        _set_property(self.path, "deviceName", "emulator-5554")
+
+        self.assertEqual(self.path.read_text(),
+            "# Appium settings\n"
+            "\n"
+            "platformName = Android\n"
+            "deviceName=emulator-5554\n"
+            "extra=1\n"
+            "extra=2\n"
+        )
+
+    def test_missing_key_is_appended(self):
+        """A new key is added at the end, a missing file is created"""
+        _set_property(self.path, "default_platform", "chrome")
+        _set_property(self.path, "deviceName", "auto")
+
+        self.assertEqual(self.path.read_text(), "default_platform=chrome\ndeviceName=auto\n")
+
+    def test_commented_key_is_not_touched(self):
+        """A commented-out entry is not mistaken for the live one"""
+        self.path.write_text("#deviceName=old\n")
+        _set_property(self.path, "deviceName", "new")
+
+        self.assertEqual(self.path.read_text(), "#deviceName=old\ndeviceName=new\n")
+
+
+class TestInit(unittest.TestCase):
+    """Test copying the project template"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.test_dir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.test_dir)
+
+    def test_init_dot_keeps_existing_directory(self):
+        """init . merges the template without touching the current directory's mode or files"""
+        os.chmod(self.test_dir, 0o700)
+        Path("notes.txt").write_text("mine")
+
+        init(".")
+
+        self.assertEqual(os.stat(self.test_dir).st_mode & 0o777, 0o700)
+        self.assertEqual(Path("notes.txt").read_text(), "mine")
+        for item in TEMPLATE_PROJECT_DIR.rglob("*"):
+            self.assertTrue((Path(self.test_dir) / item.relative_to(TEMPLATE_PROJECT_DIR)).exists(), item)
+
+
+if __name__ == '__main__':
+    unittest.main()